@@ -5,7 +5,9 @@ from sqlalchemy import pool
 
 from alembic import context
 from app.database import Base
-from app.models import Dish, AllergenLikelihood
+from app.models.dish import Dish
+from app.models.allergen import AllergenLikelihood
+from app.models.change import Change
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,46 @@
+"""cascade allergen likelihood deletes
+
+Revision ID: d4a7e1b2c390
+Revises: 9c3f2a6d81e5
+Create Date: 2026-10-19 14:22:05.317604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7e1b2c390'
+down_revision: Union[str, Sequence[str], None] = '9c3f2a6d81e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite cannot alter constraints in place and the initial foreign key is
+# unnamed, so the table is recreated with a naming convention to address it.
+naming_convention = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table(
+        'allergen_likelihoods', recreate='always', naming_convention=naming_convention
+    ) as batch_op:
+        batch_op.drop_constraint('fk_allergen_likelihoods_dish_id_dishes', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'fk_allergen_likelihoods_dish_id_dishes', 'dishes', ['dish_id'], ['id'], ondelete='CASCADE'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table(
+        'allergen_likelihoods', recreate='always', naming_convention=naming_convention
+    ) as batch_op:
+        batch_op.drop_constraint('fk_allergen_likelihoods_dish_id_dishes', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'fk_allergen_likelihoods_dish_id_dishes', 'dishes', ['dish_id'], ['id']
+        )
@@ -0,0 +1,139 @@
+import logging
+import threading
+from typing import Any, Callable, Hashable, Literal, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.allergen import AllergenLikelihood
+from app.models.change import Change
+from app.models.dish import Dish
+
+logger = logging.getLogger(__name__)
+
+_commit_listeners: list[
+    Callable[[list["DataChange"], Optional[tuple[int, int]]], None]
+] = []
+
+
+class DataChange(NamedTuple):
+    """An inserted or deleted dish or allergen likelihood row."""
+
+    op: Literal["insert", "delete"]
+    entity: Literal["dish", "allergen_likelihood"]
+    id: int
+    dish_id: int
+    allergen: Optional[str] = None
+    likelihood: Optional[int] = None
+
+
+def _to_change(op: Literal["insert", "delete"], obj) -> Optional[DataChange]:
+    if isinstance(obj, Dish):
+        return DataChange(op, "dish", obj.id, obj.id)
+    if isinstance(obj, AllergenLikelihood):
+        return DataChange(
+            op, "allergen_likelihood", obj.id, obj.dish_id, obj.allergen, obj.likelihood
+        )
+    return None
+
+
+def on_data_commit(
+    listener: Callable[[list[DataChange], Optional[tuple[int, int]]], None],
+) -> Callable[[list[DataChange], Optional[tuple[int, int]]], None]:
+    """Register a callback run with the changes of each commit that inserted or deleted data.
+
+    The callback also gets the first and last change log ids written by the
+    commit, or None if it wrote none.
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+def note_data_changes(session: Session, changes: list[DataChange]) -> None:
+    """Report changes made by bulk statements, which bypass flush tracking."""
+    if changes:
+        session.info.setdefault("data_changes", []).extend(changes)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_data_changes(session: Session, flush_context) -> None:
+    changes = [_to_change("insert", obj) for obj in session.new] + [
+        _to_change("delete", obj) for obj in session.deleted
+    ]
+    changes = [change for change in changes if change is not None]
+    if changes:
+        session.info.setdefault("data_changes", []).extend(changes)
+    change_ids = [obj.id for obj in session.new if isinstance(obj, Change)]
+    if change_ids:
+        first, last = session.info.get("change_ids", (change_ids[0], change_ids[0]))
+        session.info["change_ids"] = (min(first, *change_ids), max(last, *change_ids))
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_data_commit(session: Session) -> None:
+    changes = session.info.pop("data_changes", None)
+    change_ids = session.info.pop("change_ids", None)
+    if changes:
+        for listener in _commit_listeners:
+            # The data is already committed; a failing listener must not make
+            # the commit look failed to the caller.
+            try:
+                listener(changes, change_ids)
+            except Exception:
+                logger.exception("Data commit listener %r failed", listener)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_data_changes(session: Session) -> None:
+    session.info.pop("data_changes", None)
+    session.info.pop("change_ids", None)
+
+
+class ResultCache:
+    """Thread-safe memo of computed results, dropped wholesale on clear().
+
+    Commits made by this process clear it directly. Writes from other
+    processes are caught by passing the latest change log id as ``version``:
+    a newer version drops every entry computed before it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, Any] = {}
+        self._generation = 0
+        self._version = 0
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        version: Optional[int] = None,
+    ) -> Any:
+        with self._lock:
+            if version is not None and version > self._version:
+                self._entries.clear()
+                self._generation += 1
+                self._version = version
+            if key in self._entries:
+                return self._entries[key]
+            # A result read at an older version may miss writes the cache has
+            # already seen, so it is returned but not stored.
+            stale = version is not None and version < self._version
+            generation = None if stale else self._generation
+
+        value = compute()
+
+        with self._lock:
+            # Skip storing a result computed before a concurrent invalidation.
+            if generation == self._generation:
+                self._entries[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+response_cache = ResultCache()
+on_data_commit(lambda changes, change_ids: response_cache.clear())
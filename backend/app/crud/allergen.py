@@ -2,8 +2,11 @@ from app.models.allergen import AllergenLikelihood
 from app.models.dish import Dish
 from app.schemas.allergen import (
     AllergenLikelihoodCreate,
+    AllergenLikelihoodRead,
 )
-from sqlalchemy import select
+from app.crud.change import record_change
+from app.cache import DataChange, note_data_changes
+from sqlalchemy import delete, select
 from typing import Optional
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
@@ -11,9 +14,13 @@ from typing import Literal
 
 
 def create_allergen_likelihood(
-    db: Session, allergen: AllergenLikelihoodCreate
+    db: Session, allergen: AllergenLikelihoodCreate, commit: bool = True
 ) -> AllergenLikelihood | Literal["dish_not_found"] | Literal["already_exists"]:
-    """Create a new allergen likelihood for a dish."""
+    """Create a new allergen likelihood for a dish.
+
+    With ``commit=False`` the row is only flushed and the caller owns the
+    transaction.
+    """
 
     dish = db.get(Dish, allergen.dish_id)
     if not dish:
@@ -35,9 +42,20 @@ def create_allergen_likelihood(
     )
     db.add(new_entry)
     try:
-        db.commit()
-        db.refresh(new_entry)
+        db.flush()
+        record_change(
+            db,
+            "allergen_likelihood",
+            new_entry.id,
+            "insert",
+            AllergenLikelihoodRead.model_validate(new_entry).model_dump(),
+        )
+        if commit:
+            db.commit()
+            db.refresh(new_entry)
     except IntegrityError:
+        if not commit:
+            raise
         db.rollback()
         return "already_exists"
 
@@ -65,11 +83,37 @@ def get_allergen_likelihood(
     return db.get(AllergenLikelihood, allergen_id)
 
 
-def delete_allergen_likelihood(db: Session, allergen_id: int) -> bool:
+def delete_allergen_likelihood(
+    db: Session, allergen_id: int, commit: bool = True
+) -> bool:
     """Delete a specific allergen likelihood instance by ID."""
     result = db.get(AllergenLikelihood, allergen_id)
     if not result:
         return False
     db.delete(result)
-    db.commit()
+    record_change(db, "allergen_likelihood", allergen_id, "delete")
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     return True
+
+
+def delete_allergen_likelihoods_by_dish(db: Session, dish_id: int) -> int:
+    """Delete all allergen likelihoods of a dish in a single statement, returns how many were deleted."""
+    deleted = db.execute(
+        delete(AllergenLikelihood)
+        .where(AllergenLikelihood.dish_id == dish_id)
+        .returning(AllergenLikelihood.id, AllergenLikelihood.allergen)
+    ).all()
+    for allergen in deleted:
+        record_change(db, "allergen_likelihood", allergen.id, "delete")
+    note_data_changes(
+        db,
+        [
+            DataChange("delete", "allergen_likelihood", a.id, dish_id, a.allergen)
+            for a in deleted
+        ],
+    )
+    db.commit()
+    return len(deleted)
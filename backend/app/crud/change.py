@@ -0,0 +1,28 @@
+from app.models.change import Change
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+
+
+def record_change(
+    db: Session,
+    entity: Literal["dish", "allergen_likelihood"],
+    entity_id: int,
+    op: Literal["insert", "delete"],
+    data: Optional[dict] = None,
+) -> None:
+    """Append an entry to the change log in the caller's transaction."""
+    db.add(Change(entity=entity, entity_id=entity_id, op=op, data=data))
+
+
+def get_changes(db: Session, since: int, limit: int) -> list[Change]:
+    """Retrieve change log entries after the given cursor, oldest first."""
+    changes = db.execute(
+        select(Change).where(Change.id > since).order_by(Change.id).limit(limit)
+    )
+    return list(changes.scalars().all())
+
+
+def get_latest_change_id(db: Session) -> int:
+    """Retrieve the id of the newest change log entry, which every write appends."""
+    return db.scalar(select(func.max(Change.id))) or 0
@@ -1,14 +1,21 @@
 from app.models.dish import Dish
 from app.models.allergen import AllergenLikelihood
 from app.schemas.dish import DishCreate
-from sqlalchemy import select
-from typing import Optional
+from app.crud.change import record_change
+from app.cache import DataChange, note_data_changes
+from app.similarity import similarity_index
+from sqlalchemy import delete, select
+from typing import Literal, Optional
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 
-def create_dish(db: Session, dish: DishCreate) -> Optional[Dish]:
-    """Create a new dish if it doesn't already exist."""
+def create_dish(db: Session, dish: DishCreate, commit: bool = True) -> Optional[Dish]:
+    """Create a new dish if it doesn't already exist.
+
+    With ``commit=False`` the row is only flushed and the caller owns the
+    transaction.
+    """
     result = db.execute(select(Dish).where(Dish.name == dish.name))
     existing = result.scalar_one_or_none()
     if existing:
@@ -18,9 +25,20 @@ def create_dish(db: Session, dish: DishCreate) -> Optional[Dish]:
     db.add(new_dish)
 
     try:
-        db.commit()
-        db.refresh(new_dish)
+        db.flush()
+        record_change(
+            db,
+            "dish",
+            new_dish.id,
+            "insert",
+            {"id": new_dish.id, "name": new_dish.name, "country": new_dish.country},
+        )
+        if commit:
+            db.commit()
+            db.refresh(new_dish)
     except IntegrityError:
+        if not commit:
+            raise
         db.rollback()
         return None
 
@@ -29,16 +47,61 @@ def create_dish(db: Session, dish: DishCreate) -> Optional[Dish]:
 
 def get_all_dishes(db: Session) -> list[Dish]:
     """Retrieves all dishes"""
-    dish = db.execute(select(Dish))
+    dish = db.execute(select(Dish).options(selectinload(Dish.allergens)))
     return list(dish.scalars().all())
 
 
 def search_dish(db: Session, query: str) -> list[Dish]:
     """Searches for dishes by a query"""
-    dishes = db.execute(select(Dish).where(Dish.name.ilike(f"%{query}%")))
+    dishes = db.execute(
+        select(Dish)
+        .where(Dish.name.ilike(f"%{query}%"))
+        .options(selectinload(Dish.allergens))
+    )
     return list(dishes.scalars().all())
 
 
+def get_dish_fields(
+    db: Session,
+    columns: tuple[str, ...],
+    include_allergens: bool,
+    dish_id: Optional[int] = None,
+    query: Optional[str] = None,
+) -> list[dict]:
+    """Retrieves only the requested dish columns, loading allergens only if asked for.
+
+    Filters to one dish by ``dish_id`` or to a name search by ``query`` when given.
+    """
+    criteria = []
+    if dish_id is not None:
+        criteria.append(Dish.id == dish_id)
+    if query is not None:
+        criteria.append(Dish.name.ilike(f"%{query}%"))
+    rows = db.execute(
+        select(Dish.id.label("dish_id"), *(getattr(Dish, c) for c in columns))
+        .where(*criteria)
+        .order_by(Dish.id)
+    )
+    dishes = {row.dish_id: {c: row._mapping[c] for c in columns} for row in rows}
+    if include_allergens:
+        for dish in dishes.values():
+            dish["allergens"] = []
+        allergens = db.execute(
+            select(
+                AllergenLikelihood.dish_id,
+                AllergenLikelihood.allergen,
+                AllergenLikelihood.likelihood,
+            ).where(AllergenLikelihood.dish_id.in_(select(Dish.id).where(*criteria)))
+        )
+        for entry in allergens:
+            dish = dishes.get(entry.dish_id)
+            if dish is not None:
+                dish["allergens"].append(
+                    {"allergen": entry.allergen, "likelihood": entry.likelihood}
+                )
+    return list(dishes.values())
+
+
 def get_dish_summary(db: Session, dish_id: int) -> Optional[list[AllergenLikelihood]]:
     """Retrieve a list of dish allergens"""
     dish = db.get(Dish, dish_id)
@@ -47,16 +110,83 @@ def get_dish_summary(db: Session, dish_id: int) -> Optional[list[AllergenLikelih
     return dish.allergens
 
 
+def get_similar_dishes(
+    db: Session,
+    dish_id: int,
+    k: int,
+    metric: Literal["cosine", "l1"] = "cosine",
+    exclude: Optional[list[str]] = None,
+) -> Optional[list[tuple[Dish, float]]]:
+    """Retrieve the k dishes with the most similar allergen profile, with their scores"""
+    similarity_index.ensure_loaded(db)
+    ranked = similarity_index.top_k(dish_id, k, metric, exclude)
+    if ranked is None:
+        return None
+    dishes = db.execute(select(Dish).where(Dish.id.in_([id for id, _ in ranked])))
+    by_id = {dish.id: dish for dish in dishes.scalars()}
+    return [(by_id[id], score) for id, score in ranked if id in by_id]
+
+
 def get_dish(db: Session, dish_id: int) -> Optional[Dish]:
     """Retrieve a dish by its ID."""
     return db.get(Dish, dish_id)
 
 
-def delete_dish(db: Session, dish_id: int) -> bool:
+def delete_dish(db: Session, dish_id: int, commit: bool = True) -> bool:
     """Delete a dish by its ID if it exists."""
     result = db.get(Dish, dish_id)
     if not result:
         return False
+    # Delete the likelihoods with one statement instead of relying on the
+    # foreign key's ON DELETE CASCADE, which databases created before the
+    # cascade migration do not have.
+    allergens = db.execute(
+        delete(AllergenLikelihood)
+        .where(AllergenLikelihood.dish_id == dish_id)
+        .returning(AllergenLikelihood.id, AllergenLikelihood.allergen)
+    ).all()
+    for allergen in allergens:
+        record_change(db, "allergen_likelihood", allergen.id, "delete")
+    note_data_changes(
+        db,
+        [
+            DataChange("delete", "allergen_likelihood", a.id, dish_id, a.allergen)
+            for a in allergens
+        ],
+    )
+    record_change(db, "dish", dish_id, "delete")
     db.delete(result)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     return True
+
+
+def delete_dishes(db: Session, dish_ids: list[int]) -> int:
+    """Delete dishes by their IDs in a single statement, returns how many were deleted."""
+    allergens = db.execute(
+        delete(AllergenLikelihood)
+        .where(AllergenLikelihood.dish_id.in_(dish_ids))
+        .returning(
+            AllergenLikelihood.id, AllergenLikelihood.dish_id, AllergenLikelihood.allergen
+        )
+    ).all()
+    deleted = db.execute(
+        delete(Dish).where(Dish.id.in_(dish_ids)).returning(Dish.id)
+    ).scalars().all()
+
+    for allergen in allergens:
+        record_change(db, "allergen_likelihood", allergen.id, "delete")
+    for dish_id in deleted:
+        record_change(db, "dish", dish_id, "delete")
+    note_data_changes(
+        db,
+        [
+            DataChange("delete", "allergen_likelihood", a.id, a.dish_id, a.allergen)
+            for a in allergens
+        ]
+        + [DataChange("delete", "dish", dish_id, dish_id) for dish_id in deleted],
+    )
+    db.commit()
+    return len(deleted)
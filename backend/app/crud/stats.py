@@ -0,0 +1,59 @@
+from app.models.allergen import AllergenLikelihood
+from app.models.dish import Dish
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+from typing import Literal
+
+
+def get_allergen_stats(
+    db: Session, group_by: Literal["country", "allergen"]
+) -> list[dict]:
+    """Aggregate allergen prevalence and likelihoods per allergen or per country and allergen."""
+    dish_count = func.count(distinct(AllergenLikelihood.dish_id)).label("dish_count")
+    mean_likelihood = func.avg(AllergenLikelihood.likelihood).label("mean_likelihood")
+    max_likelihood = func.max(AllergenLikelihood.likelihood).label("max_likelihood")
+
+    if group_by == "allergen":
+        total_dishes = select(func.count(Dish.id)).scalar_subquery()
+        stmt = (
+            select(
+                AllergenLikelihood.allergen,
+                dish_count,
+                mean_likelihood,
+                max_likelihood,
+                total_dishes.label("total_dishes"),
+            )
+            .group_by(AllergenLikelihood.allergen)
+            .order_by(AllergenLikelihood.allergen)
+        )
+    else:
+        dishes_per_country = (
+            select(Dish.country, func.count(Dish.id).label("total_dishes"))
+            .group_by(Dish.country)
+            .subquery()
+        )
+        stmt = (
+            select(
+                Dish.country,
+                AllergenLikelihood.allergen,
+                dish_count,
+                mean_likelihood,
+                max_likelihood,
+                dishes_per_country.c.total_dishes,
+            )
+            .join(Dish, Dish.id == AllergenLikelihood.dish_id)
+            .join(
+                dishes_per_country,
+                Dish.country.is_not_distinct_from(dishes_per_country.c.country),
+            )
+            .group_by(Dish.country, AllergenLikelihood.allergen)
+            .order_by(Dish.country, AllergenLikelihood.allergen)
+        )
+
+    stats = []
+    for row in db.execute(stmt).mappings():
+        entry = dict(row)
+        total = entry.pop("total_dishes")
+        entry["prevalence"] = entry["dish_count"] / total if total else 0.0
+        stats.append(entry)
+    return stats
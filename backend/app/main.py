@@ -1,8 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import dish, allergen
+from app.routers import dish, allergen, stats, change, batch
 from app.database import Base, engine
+from app.compression import CompressionMiddleware
+from app.write_queue import write_queue
+from app.snapshot import SNAPSHOT_MODE, install_reload_handler, reload_snapshot
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SNAPSHOT_MODE:
+        reload_snapshot()
+        install_reload_handler()
+    yield
+    if write_queue is not None:
+        write_queue.close()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
 
 Base.metadata.create_all(bind=engine)
 
@@ -14,3 +30,6 @@ def root():
 
 app.include_router(dish.router)
 app.include_router(allergen.router)
+app.include_router(stats.router)
+app.include_router(change.router)
+app.include_router(batch.router)
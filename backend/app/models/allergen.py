@@ -7,8 +7,8 @@ class AllergenLikelihood(Base):
     __tablename__ = "allergen_likelihoods"
 
     id = Column(Integer, primary_key=True, index=True)
-    dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=False, index=True)
-    allergen = Column(String, nullable=False)
+    dish_id = Column(Integer, ForeignKey("dishes.id", ondelete="CASCADE"), nullable=False, index=True)
+    allergen = Column(String, nullable=False, index=True)
     likelihood = Column(Integer, nullable=False)
 
     dish = relationship("Dish", back_populates="allergens")
@@ -0,0 +1,13 @@
+from app.database import Base
+from sqlalchemy import JSON, Column, Integer, String
+
+
+class Change(Base):
+    __tablename__ = "changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    data = Column(JSON)
@@ -8,8 +8,11 @@ class Dish(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True)
-    country = Column(String)
+    country = Column(String, index=True)
 
     allergens = relationship(
-        "AllergenLikelihood", back_populates="dish", cascade="all, delete-orphan"
+        "AllergenLikelihood",
+        back_populates="dish",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
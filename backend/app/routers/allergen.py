@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
 from app.schemas.allergen import (
     AllergenLikelihoodCreate,
     AllergenLikelihoodRead,
@@ -10,12 +11,21 @@ from app.crud.allergen import (
     delete_allergen_likelihood,
     get_all_allergen_likelihood,
     get_allergen_likelihoods_by_dish,
+    delete_allergen_likelihoods_by_dish,
 )
+from app.write_queue import WriteQueue, get_write_queue
+from app.snapshot import Snapshot, get_snapshot, json_response
+from app.cache import response_cache
+from app.crud.change import get_latest_change_id
+from app.compression import CompressedBody, compressed_response
 from sqlalchemy.orm import Session
+from typing import Optional
 
 
 router = APIRouter(prefix="/allergens", tags=["allergens"])
 
+_allergen_list = TypeAdapter(list[AllergenLikelihoodRead])
+
 
 @router.post(
     "/",
@@ -25,10 +35,15 @@ router = APIRouter(prefix="/allergens", tags=["allergens"])
     description="Create a new allergen likelihood entry in the database.",
 )
 def create_allergen_likelihood_endpoint(
-    allergen: AllergenLikelihoodCreate, db: Session = Depends(get_db)
+    allergen: AllergenLikelihoodCreate,
+    db: Session = Depends(get_db),
+    write_queue: Optional[WriteQueue] = Depends(get_write_queue),
 ) -> AllergenLikelihoodRead:
     """Endpoint to create a new allergen likelihood entry for a dish. Returns 400 if duplicate."""
-    new_allergen = create_allergen_likelihood(db, allergen)
+    if write_queue is not None:
+        new_allergen = write_queue.submit(create_allergen_likelihood, allergen)
+    else:
+        new_allergen = create_allergen_likelihood(db, allergen)
     if new_allergen == "dish_not_found":
         raise HTTPException(status_code=400, detail="Dish does not exist")
     elif new_allergen == "already_exists":
@@ -46,12 +61,25 @@ def create_allergen_likelihood_endpoint(
     description="Retrieves all allergen likelihood instances",
 )
 def get_all_allergen_likelihood_endpoint(
+    request: Request,
     db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
 ) -> list[AllergenLikelihoodRead]:
-    allergens_likelihoods = get_all_allergen_likelihood(db)
-    return [
-        AllergenLikelihoodRead.model_validate(entry) for entry in allergens_likelihoods
-    ]
+    if snapshot is not None:
+        return compressed_response(request, snapshot.all_allergens_json)
+    body = response_cache.get_or_compute(
+        ("allergens",),
+        lambda: CompressedBody(
+            _allergen_list.dump_json(
+                [
+                    AllergenLikelihoodRead.model_validate(entry)
+                    for entry in get_all_allergen_likelihood(db)
+                ]
+            )
+        ),
+        version=get_latest_change_id(db),
+    )
+    return compressed_response(request, body)
 
 
 @router.get(
@@ -61,8 +89,12 @@ def get_all_allergen_likelihood_endpoint(
     description="Retrieves all allergen likelihood instances by dish id",
 )
 def get_allergen_likelihoods_by_dish_endpoint(
-    dish_id: int, db: Session = Depends(get_db)
+    dish_id: int,
+    db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
 ) -> list[AllergenLikelihoodRead]:
+    if snapshot is not None:
+        return json_response(snapshot.get_allergen_likelihoods_by_dish(dish_id))
     allergens_likelihoods = get_allergen_likelihoods_by_dish(db, dish_id)
     return [
         AllergenLikelihoodRead.model_validate(entry) for entry in allergens_likelihoods
@@ -76,9 +108,16 @@ def get_allergen_likelihoods_by_dish_endpoint(
     description="Retrieves a allergen likelihood entry by its ID",
 )
 def get_allergen_likelihood_endpoint(
-    allergen_id: int, db: Session = Depends(get_db)
+    allergen_id: int,
+    db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
 ) -> AllergenLikelihoodRead:
     """Endpoint to get allergen likelihood entry info by ID. Returns 404 if not found."""
+    if snapshot is not None:
+        body = snapshot.get_allergen_likelihood(allergen_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Allergen not found")
+        return json_response(body)
     allergen = get_allergen_likelihood(db, allergen_id)
     print("Returned allergen from DB:", allergen)
     print("Type:", type(allergen))
@@ -94,10 +133,29 @@ def get_allergen_likelihood_endpoint(
     description="deletes an allergen likelihood entry by its ID",
 )
 def delete_allergen_likelihood_endpoint(
-    allergen_id: int, db: Session = Depends(get_db)
+    allergen_id: int,
+    db: Session = Depends(get_db),
+    write_queue: Optional[WriteQueue] = Depends(get_write_queue),
 ) -> Response:
     """Endpoint to delete allergen likelihood entry by ID. Returns 204 or 404."""
-    response = delete_allergen_likelihood(db, allergen_id)
+    if write_queue is not None:
+        response = write_queue.submit(delete_allergen_likelihood, allergen_id)
+    else:
+        response = delete_allergen_likelihood(db, allergen_id)
     if not response:
         raise HTTPException(status_code=404, detail="Allergen not found")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.delete(
+    "/by-dish/{dish_id}",
+    status_code=204,
+    summary="Deletes all allergen likelihood entries of a dish",
+    description="deletes all allergen likelihood entries by dish id",
+)
+def delete_allergen_likelihoods_by_dish_endpoint(
+    dish_id: int, db: Session = Depends(get_db)
+) -> Response:
+    """Endpoint to delete every allergen likelihood entry of a dish. Returns 204."""
+    delete_allergen_likelihoods_by_dish(db, dish_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,148 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, ValidationError
+from app.schemas.batch import BatchRequest, BatchResult
+from app.schemas.dish import DishCreate, DishRead
+from app.schemas.allergen import AllergenLikelihoodCreate, AllergenLikelihoodRead
+from app.database import get_db
+from app.crud.dish import create_dish, delete_dish
+from app.crud.allergen import create_allergen_likelihood, delete_allergen_likelihood
+from app.constants import dish_not_found
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Optional
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+
+class BatchOperationError(Exception):
+    def __init__(self, status_code: int, detail: Any) -> None:
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _validate(schema: type[BaseModel], data: dict) -> Any:
+    try:
+        return schema.model_validate(data)
+    except ValidationError as exc:
+        raise BatchOperationError(
+            422, exc.errors(include_url=False, include_context=False)
+        )
+
+
+def _id(data: dict) -> int:
+    value = data.get("id")
+    # bool is a subclass of int, so JSON true/false would pass isinstance().
+    if type(value) is not int:
+        raise BatchOperationError(422, "An integer id is required")
+    return value
+
+
+def _create_dish(db: Session, data: dict) -> BatchResult:
+    dish = create_dish(db, _validate(DishCreate, data), commit=False)
+    if not dish:
+        raise BatchOperationError(400, "Dish already exists")
+    return BatchResult(
+        op="create_dish",
+        status=status.HTTP_201_CREATED,
+        data=DishRead.model_validate(dish).model_dump(),
+    )
+
+
+def _delete_dish(db: Session, data: dict) -> BatchResult:
+    if not delete_dish(db, _id(data), commit=False):
+        raise BatchOperationError(404, dish_not_found)
+    return BatchResult(op="delete_dish", status=status.HTTP_204_NO_CONTENT)
+
+
+def _create_allergen_likelihood(db: Session, data: dict) -> BatchResult:
+    allergen = create_allergen_likelihood(
+        db, _validate(AllergenLikelihoodCreate, data), commit=False
+    )
+    if allergen == "dish_not_found":
+        raise BatchOperationError(400, "Dish does not exist")
+    elif allergen == "already_exists":
+        raise BatchOperationError(
+            400, "Allergen likelihood entry already exists for this dish"
+        )
+    return BatchResult(
+        op="create_allergen_likelihood",
+        status=status.HTTP_201_CREATED,
+        data=AllergenLikelihoodRead.model_validate(allergen).model_dump(),
+    )
+
+
+def _delete_allergen_likelihood(db: Session, data: dict) -> BatchResult:
+    if not delete_allergen_likelihood(db, _id(data), commit=False):
+        raise BatchOperationError(404, "Allergen not found")
+    return BatchResult(
+        op="delete_allergen_likelihood", status=status.HTTP_204_NO_CONTENT
+    )
+
+
+_HANDLERS = {
+    "create_dish": _create_dish,
+    "delete_dish": _delete_dish,
+    "create_allergen_likelihood": _create_allergen_likelihood,
+    "delete_allergen_likelihood": _delete_allergen_likelihood,
+}
+
+
+# For each operation, the keys that may hold a "$<n>" reference and the
+# operation that must have created the referenced row.
+_REFERENCES = {
+    "create_allergen_likelihood": {"dish_id": "create_dish"},
+    "delete_dish": {"id": "create_dish"},
+    "delete_allergen_likelihood": {"id": "create_allergen_likelihood"},
+}
+
+
+def _resolve(op: str, data: dict, results: list[BatchResult]) -> dict:
+    """Replace "$<n>" id references with the id created by operation n."""
+    references = _REFERENCES.get(op, {})
+    resolved = {}
+    for key, value in data.items():
+        if key in references and isinstance(value, str) and value.startswith("$"):
+            source = references[key]
+            index = value[1:]
+            created: Optional[BatchResult] = None
+            if index.isdigit() and int(index) < len(results):
+                created = results[int(index)]
+            if created is None or created.op != source:
+                raise BatchOperationError(
+                    422, f"{value} does not refer to an earlier {source} operation"
+                )
+            value = created.data["id"]
+        resolved[key] = value
+    return resolved
+
+
+@router.post(
+    "/",
+    response_model=list[BatchResult],
+    summary="Run a batch of operations",
+    description="Runs an ordered list of create and delete operations in a single transaction.",
+)
+def batch_endpoint(
+    batch: BatchRequest, db: Session = Depends(get_db)
+) -> list[BatchResult]:
+    """Endpoint to apply several writes at once. Nothing is applied if any operation fails."""
+    results: list[BatchResult] = []
+    for index, operation in enumerate(batch.operations):
+        try:
+            handler = _HANDLERS[operation.op]
+            data = _resolve(operation.op, operation.data, results)
+            results.append(handler(db, data))
+        except BatchOperationError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=exc.status_code,
+                detail={"index": index, "op": operation.op, "detail": exc.detail},
+            )
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail={"index": index, "op": operation.op, "detail": "Conflict"},
+            )
+    db.commit()
+    return results
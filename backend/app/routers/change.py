@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from app.schemas.change import ChangeFeed, ChangeRead
+from app.database import get_db
+from app.crud.change import get_changes
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+@router.get(
+    "/",
+    response_model=ChangeFeed,
+    summary="Get changes since a cursor",
+    description="Retrieves inserts and deletes of dishes and allergen likelihoods after the given cursor.",
+)
+def get_changes_endpoint(
+    since: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+) -> ChangeFeed:
+    """Endpoint to sync incrementally. Pass the returned cursor as `since` on the next call."""
+    changes = get_changes(db, since, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return ChangeFeed(
+        changes=[ChangeRead.model_validate(change) for change in changes],
+        cursor=changes[-1].id if changes else since,
+        has_more=has_more,
+    )
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
 from app.schemas.dish import (
     DishCreate,
+    DishPartial,
     DishRead,
+    SimilarDish,
 )
 from app.schemas.allergen import AllergenLikelihoodNested
 from app.database import get_db
@@ -9,15 +13,66 @@ from app.crud.dish import (
     create_dish,
     get_dish,
     delete_dish,
+    delete_dishes,
     search_dish,
     get_all_dishes,
     get_dish_summary,
+    get_dish_fields,
+    get_similar_dishes,
 )
 from sqlalchemy.orm import Session
 from app.constants import dish_not_found
+from app.coalesce import dish_reads
+from app.snapshot import Snapshot, get_snapshot, json_response
+from app.cache import response_cache
+from app.crud.change import get_latest_change_id
+from app.compression import CompressedBody, compressed_response
+from typing import Literal, NamedTuple, Optional, Union
 
 router = APIRouter(prefix="/dishes", tags=["dishes"])
 
+_dish = TypeAdapter(DishRead)
+_dish_list = TypeAdapter(list[DishRead])
+_partial_dish = TypeAdapter(dict)
+_partial_dish_list = TypeAdapter(list[dict])
+_summary_list = TypeAdapter(list[AllergenLikelihoodNested])
+
+DISH_COLUMNS = ("id", "name", "country")
+
+
+class DishFields(NamedTuple):
+    """A sparse fieldset: the dish columns to return and whether to add allergens."""
+
+    columns: tuple[str, ...]
+    include_allergens: bool
+
+
+def dish_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated dish fields to return, e.g. id,name"
+    ),
+    include: Optional[str] = Query(
+        None, description="Set to allergens to add allergens to a sparse response"
+    ),
+) -> Optional[DishFields]:
+    """Parse the sparse fieldset query parameters. None means the full dish."""
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    included = {name.strip() for name in (include or "").split(",") if name.strip()}
+    unknown = (requested - {*DISH_COLUMNS, "allergens"}) | (included - {"allergens"})
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    sparse = DishFields(
+        tuple(column for column in DISH_COLUMNS if column in requested),
+        "allergens" in requested | included,
+    )
+    if not sparse.columns and not sparse.include_allergens:
+        raise HTTPException(status_code=400, detail="No fields requested")
+    return sparse
+
 
 @router.post(
     "/",
@@ -36,22 +91,54 @@ def create_dish_endpoint(dish: DishCreate, db: Session = Depends(get_db)) -> Dis
 
 @router.get(
     "/",
-    response_model=list[DishRead],
+    response_model=list[Union[DishRead, DishPartial]],
     summary="Get all dishes",
-    description="Retrieves all dishes",
+    description="Retrieves all dishes. Use `fields` to return only some fields.",
 )
-def get_all_dishes_endpoint(db: Session = Depends(get_db)) -> list[DishRead]:
-    dishes = get_all_dishes(db)
-    return [DishRead.model_validate(dish) for dish in dishes]
+def get_all_dishes_endpoint(
+    request: Request,
+    sparse: Optional[DishFields] = Depends(dish_fields),
+    db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> list[DishRead]:
+    if snapshot is not None:
+        if sparse is None:
+            return compressed_response(request, snapshot.all_dishes_json)
+        return json_response(snapshot.get_all_dishes(*sparse))
+    body = response_cache.get_or_compute(
+        ("dishes", sparse),
+        lambda: CompressedBody(_dump_dishes(db, sparse)),
+        version=get_latest_change_id(db),
+    )
+    return compressed_response(request, body)
+
+
+def _dump_dishes(db: Session, sparse: Optional[DishFields]) -> bytes:
+    if sparse is None:
+        return _dish_list.dump_json(
+            [DishRead.model_validate(dish) for dish in get_all_dishes(db)]
+        )
+    return _partial_dish_list.dump_json(get_dish_fields(db, *sparse))
 
 
 @router.get(
     "/search",
-    response_model=list[DishRead],
+    response_model=list[Union[DishRead, DishPartial]],
     summary="Searches for dishes",
-    description="Searches for dishes by a query",
+    description="Searches for dishes by a query. Use `fields` to return only some fields.",
 )
-def search_dish_endpoint(query: str, db: Session = Depends(get_db)) -> list[DishRead]:
+def search_dish_endpoint(
+    query: str,
+    sparse: Optional[DishFields] = Depends(dish_fields),
+    db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> list[DishRead]:
+    if snapshot is not None:
+        if sparse is None:
+            return json_response(snapshot.search_dish(query))
+        return json_response(snapshot.search_dish(query, *sparse))
+    if sparse is not None:
+        return JSONResponse(get_dish_fields(db, *sparse, query=query))
     dishes = search_dish(db, query)
     return [DishRead.model_validate(dish) for dish in dishes]
 
@@ -63,26 +150,90 @@ def search_dish_endpoint(query: str, db: Session = Depends(get_db)) -> list[Dish
     description="Retrieve a list of dish allergens",
 )
 def get_dish_summary_endpoint(
-    dish_id: int, db: Session = Depends(get_db)
+    dish_id: int,
+    db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
 ) -> list[AllergenLikelihoodNested]:
+    if snapshot is not None:
+        body = snapshot.get_dish_summary(dish_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail=dish_not_found)
+        return json_response(body)
+    body = dish_reads.do(("summary", dish_id), lambda: _read_summary(db, dish_id))
+    if body is None:
+        raise HTTPException(status_code=404, detail=dish_not_found)
+    return json_response(body)
+
+
+def _read_summary(db: Session, dish_id: int) -> Optional[bytes]:
     allergens = get_dish_summary(db, dish_id)
     if allergens is None:
-        raise HTTPException(status_code=404, detail=dish_not_found)
-    return [AllergenLikelihoodNested.model_validate(allergen) for allergen in allergens]
+        return None
+    return _summary_list.dump_json(
+        [AllergenLikelihoodNested.model_validate(allergen) for allergen in allergens]
+    )
 
 
 @router.get(
     "/{dish_id}",
-    response_model=DishRead,
+    response_model=Union[DishRead, DishPartial],
     summary="Get a dish",
-    description="Retrieves a dish by its ID.",
+    description="Retrieves a dish by its ID. Use `fields` to return only some fields.",
 )
-def get_dish_endpoint(dish_id: int, db: Session = Depends(get_db)) -> DishRead:
+def get_dish_endpoint(
+    dish_id: int,
+    sparse: Optional[DishFields] = Depends(dish_fields),
+    db: Session = Depends(get_db),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> DishRead:
     """Endpoint to retrieve a dish by ID. Returns 404 if not found."""
+    if snapshot is not None:
+        body = snapshot.get_dish(dish_id, *(sparse or ()))
+        if body is None:
+            raise HTTPException(status_code=404, detail=dish_not_found)
+        return json_response(body)
+    # Concurrent readers share the leader's serialized body, not just its rows.
+    body = dish_reads.do(
+        ("dish", dish_id, sparse), lambda: _read_dish(db, dish_id, sparse)
+    )
+    if body is None:
+        raise HTTPException(status_code=404, detail=dish_not_found)
+    return json_response(body)
+
+
+def _read_dish(
+    db: Session, dish_id: int, sparse: Optional[DishFields]
+) -> Optional[bytes]:
+    if sparse is not None:
+        dishes = get_dish_fields(db, *sparse, dish_id=dish_id)
+        return _partial_dish.dump_json(dishes[0]) if dishes else None
     dish = get_dish(db, dish_id)
     if not dish:
+        return None
+    return _dish.dump_json(DishRead.model_validate(dish))
+
+
+@router.get(
+    "/{dish_id}/similar",
+    response_model=list[SimilarDish],
+    summary="Get similar dishes",
+    description="Retrieves the dishes with the most similar allergen profile, optionally excluding dishes containing given allergens.",
+)
+def get_similar_dishes_endpoint(
+    dish_id: int,
+    k: int = Query(10, ge=1, le=100),
+    metric: Literal["cosine", "l1"] = "cosine",
+    exclude: Optional[list[str]] = Query(None),
+    db: Session = Depends(get_db),
+) -> list[SimilarDish]:
+    """Endpoint to suggest alternatives to a dish. Returns 404 if not found."""
+    similar = get_similar_dishes(db, dish_id, k, metric, exclude)
+    if similar is None:
         raise HTTPException(status_code=404, detail=dish_not_found)
-    return dish
+    return [
+        SimilarDish(id=dish.id, name=dish.name, country=dish.country, score=score)
+        for dish, score in similar
+    ]
 
 
 @router.delete(
@@ -97,3 +248,17 @@ def delete_dish_endpoint(dish_id: int, db: Session = Depends(get_db)) -> Respons
     if not response:
         raise HTTPException(status_code=404, detail=dish_not_found)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.delete(
+    "/",
+    status_code=204,
+    summary="Delete dishes",
+    description="Deletes all dishes with the given IDs, along with their allergen likelihoods.",
+)
+def delete_dishes_endpoint(
+    ids: list[int] = Query(...), db: Session = Depends(get_db)
+) -> Response:
+    """Endpoint to delete dishes in bulk. Returns 204."""
+    delete_dishes(db, ids)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, Request
+from pydantic import TypeAdapter
+from app.schemas.stats import AllergenStat, CoalescingStats
+from app.database import get_db
+from app.crud.stats import get_allergen_stats
+from app.cache import response_cache
+from app.crud.change import get_latest_change_id
+from app.coalesce import dish_reads
+from app.compression import CompressedBody, compressed_response
+from sqlalchemy.orm import Session
+from typing import Literal
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+_stat_list = TypeAdapter(list[AllergenStat])
+
+
+@router.get(
+    "/allergens",
+    response_model=list[AllergenStat],
+    summary="Get allergen statistics",
+    description="Allergen prevalence and mean/max likelihood per allergen, or per country and allergen.",
+)
+def get_allergen_stats_endpoint(
+    request: Request,
+    group_by: Literal["country", "allergen"] = "country",
+    db: Session = Depends(get_db),
+) -> list[AllergenStat]:
+    """Endpoint to get aggregated allergen statistics. Cached until the next write."""
+    body = response_cache.get_or_compute(
+        ("stats", "allergens", group_by),
+        lambda: CompressedBody(
+            _stat_list.dump_json(
+                [AllergenStat(**entry) for entry in get_allergen_stats(db, group_by)]
+            )
+        ),
+        version=get_latest_change_id(db),
+    )
+    return compressed_response(request, body)
+
+
+@router.get(
+    "/coalescing",
+    response_model=CoalescingStats,
+    summary="Get request coalescing statistics",
+    description="Number of dish reads served by sharing another request's in-flight lookup.",
+)
+def get_coalescing_stats_endpoint() -> CoalescingStats:
+    return CoalescingStats(coalesced=dish_reads.coalesced)
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Any, Literal, Optional
+
+
+class BatchOperation(BaseModel):
+    """Schema for one operation of a batch.
+
+    An ``id`` or ``dish_id`` in ``data`` of the form ``"$<n>"`` is replaced by
+    the id created by operation ``n`` of the same batch.
+    """
+
+    op: Literal[
+        "create_dish",
+        "delete_dish",
+        "create_allergen_likelihood",
+        "delete_allergen_likelihood",
+    ]
+    data: dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    """Schema for an ordered list of operations run in one transaction."""
+
+    operations: list[BatchOperation] = Field(..., max_length=1000)
+
+
+class BatchResult(BaseModel):
+    """Schema for the result of one batch operation."""
+
+    op: str
+    status: int
+    data: Optional[dict[str, Any]] = None
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Literal, Optional
+
+
+class ChangeRead(BaseModel):
+    """Schema for reading a change log entry. Deletes carry no data."""
+
+    id: int
+    entity: Literal["dish", "allergen_likelihood"]
+    entity_id: int
+    op: Literal["insert", "delete"]
+    data: Optional[dict] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangeFeed(BaseModel):
+    """Schema for a page of the change feed."""
+
+    changes: list[ChangeRead]
+    cursor: int
+    has_more: bool
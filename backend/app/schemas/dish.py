@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List
+from typing import List, Optional
 from .allergen import AllergenLikelihoodNested
 
 
@@ -23,3 +23,19 @@ class DishRead(DishBase):
     allergens: List[AllergenLikelihoodNested] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SimilarDish(DishBase):
+    """Schema for a dish with a similar allergen profile."""
+
+    id: int
+    score: float
+
+
+class DishPartial(BaseModel):
+    """Schema for a sparse dish; only the requested fields are present."""
+
+    id: Optional[int] = None
+    name: Optional[str] = None
+    country: Optional[str] = None
+    allergens: Optional[List[AllergenLikelihoodNested]] = None
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class AllergenStat(BaseModel):
+    """Schema for aggregated allergen statistics of one group."""
+
+    country: Optional[str] = None
+    allergen: str
+    dish_count: int
+    prevalence: float
+    mean_likelihood: float
+    max_likelihood: int
+
+
+class CoalescingStats(BaseModel):
+    """Schema for request coalescing counters."""
+
+    coalesced: int
@@ -0,0 +1,175 @@
+import threading
+from typing import Literal, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.cache import DataChange, on_data_commit
+from app.crud.change import get_latest_change_id
+from app.models.allergen import AllergenLikelihood
+from app.models.dish import Dish
+
+
+def _apply_order(change: DataChange) -> int:
+    if change.entity == "dish":
+        return 0 if change.op == "insert" else 2
+    return 1
+
+
+class SimilarityIndex:
+    """Dense dish x allergen likelihood matrix for vectorized top-k lookups.
+
+    Built from the database on first use, then kept current by applying
+    committed inserts and deletes cell by cell. Deleted dishes keep their row
+    slot but are masked out of results. The index remembers the latest change
+    log id it reflects and is rebuilt when the database has changes it did not
+    see, such as writes from another process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._loaded = False
+        self._version: Optional[int] = None
+        self._rows: dict[int, int] = {}
+        self._columns: dict[str, int] = {}
+        self._dish_ids = np.zeros(0, dtype=np.int64)
+        self._active = np.zeros(0, dtype=bool)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+
+    def ensure_loaded(self, db: Session) -> None:
+        version = get_latest_change_id(db)
+        with self._lock:
+            if self._loaded and self._version is not None and self._version >= version:
+                return
+            self._clear()
+            for (dish_id,) in db.execute(select(Dish.id).order_by(Dish.id)):
+                self._add_dish(dish_id)
+            for dish_id, allergen, likelihood in db.execute(
+                select(
+                    AllergenLikelihood.dish_id,
+                    AllergenLikelihood.allergen,
+                    AllergenLikelihood.likelihood,
+                )
+            ):
+                self._set(dish_id, allergen, likelihood)
+            self._loaded = True
+            self._version = version
+
+    def apply(
+        self, changes: list[DataChange], change_ids: Optional[tuple[int, int]]
+    ) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            if change_ids is not None:
+                # Only stay current if no other writer committed in between.
+                first, last = change_ids
+                in_sequence = self._version is not None and first == self._version + 1
+                self._version = last if in_sequence else None
+            # Rows must exist before their cells are set, whatever the flush order.
+            for change in sorted(changes, key=_apply_order):
+                if change.entity == "dish":
+                    if change.op == "insert":
+                        self._add_dish(change.dish_id)
+                    else:
+                        self._remove_dish(change.dish_id)
+                elif change.op == "insert":
+                    self._set(change.dish_id, change.allergen, change.likelihood)
+                else:
+                    self._set(change.dish_id, change.allergen, 0)
+
+    def top_k(
+        self,
+        dish_id: int,
+        k: int,
+        metric: Literal["cosine", "l1"] = "cosine",
+        exclude: Optional[list[str]] = None,
+    ) -> Optional[list[tuple[int, float]]]:
+        """Return up to k (dish id, score) pairs most similar to the dish, best first."""
+        with self._lock:
+            row = self._rows.get(dish_id)
+            if row is None or not self._active[row]:
+                return None
+            matrix = self._matrix[: self._size]
+            query = matrix[row]
+
+            if metric == "cosine":
+                norms = np.linalg.norm(matrix, axis=1)
+                denominator = norms * np.linalg.norm(query)
+                scores = np.divide(
+                    matrix @ query,
+                    denominator,
+                    out=np.zeros(self._size, dtype=np.float32),
+                    where=denominator > 0,
+                )
+            else:
+                scores = -np.abs(matrix - query).sum(axis=1)
+
+            candidates = self._active[: self._size].copy()
+            candidates[row] = False
+            columns = [self._columns[a] for a in exclude or () if a in self._columns]
+            if columns:
+                candidates &= ~(matrix[:, columns] > 0).any(axis=1)
+
+            indices = np.flatnonzero(candidates)
+            if k < len(indices):
+                best = np.argpartition(-scores[indices], k - 1)[:k]
+                indices = indices[best]
+            indices = indices[np.argsort(-scores[indices], kind="stable")]
+            return [(int(self._dish_ids[i]), float(scores[i])) for i in indices]
+
+    def _add_dish(self, dish_id: int) -> None:
+        if dish_id in self._rows:
+            self._active[self._rows[dish_id]] = True
+            return
+        if self._size == len(self._dish_ids):
+            capacity = max(64, 2 * self._size)
+            self._dish_ids = np.resize(self._dish_ids, capacity)
+            self._active = np.concatenate(
+                [self._active, np.zeros(capacity - self._size, dtype=bool)]
+            )
+            matrix = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+            matrix[: self._size] = self._matrix[: self._size]
+            self._matrix = matrix
+        row = self._size
+        self._size += 1
+        self._rows[dish_id] = row
+        self._dish_ids[row] = dish_id
+        self._active[row] = True
+        self._matrix[row] = 0
+
+    def _remove_dish(self, dish_id: int) -> None:
+        row = self._rows.get(dish_id)
+        if row is not None:
+            self._active[row] = False
+            self._matrix[row] = 0
+
+    def _set(self, dish_id: int, allergen: str, likelihood: int) -> None:
+        row = self._rows.get(dish_id)
+        if row is None:
+            return
+        column = self._columns.get(allergen)
+        if column is None:
+            if not likelihood:
+                return
+            column = len(self._columns)
+            self._columns[allergen] = column
+            if column == self._matrix.shape[1]:
+                capacity = max(16, 2 * column)
+                matrix = np.zeros((self._matrix.shape[0], capacity), dtype=np.float32)
+                matrix[:, :column] = self._matrix
+                self._matrix = matrix
+        self._matrix[row, column] = likelihood
+
+
+similarity_index = SimilarityIndex()
+on_data_commit(similarity_index.apply)
@@ -0,0 +1,220 @@
+import json
+import os
+import re
+import signal
+import string
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Optional
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.compression import CompressedBody
+from app.database import SessionLocal
+from app.models.allergen import AllergenLikelihood
+from app.models.dish import Dish
+
+SNAPSHOT_MODE = os.getenv("SNAPSHOT_MODE", "0") == "1"
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _join(items) -> bytes:
+    return b"[" + b",".join(items) + b"]"
+
+
+_DISH_COLUMNS = {"id": 0, "name": 1, "country": 2}
+
+# SQLite's lower() and LIKE only fold ASCII letters, so neither do we.
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _like_matcher(query: str):
+    """Match names the way the database's ``ILIKE '%query%'`` does."""
+    query = query.translate(_ASCII_LOWER)
+    if "%" not in query and "_" not in query:
+        return lambda name: query in name
+    pattern = "".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char)
+        for char in query
+    )
+    return re.compile(pattern, re.DOTALL).search
+
+
+def _find(ids: array, key: int) -> Optional[int]:
+    offset = bisect_left(ids, key)
+    if offset < len(ids) and ids[offset] == key:
+        return offset
+    return None
+
+
+class Snapshot:
+    """Immutable in-memory copy of dishes and allergen likelihoods.
+
+    Rows are addressed by their offset in sorted id arrays and every response
+    body is serialized once at build time, so reads never touch the database.
+    """
+
+    def __init__(self, dishes: list, likelihoods: list) -> None:
+        allergens_by_dish: dict[int, list] = {}
+        for row in likelihoods:
+            allergens_by_dish.setdefault(row.dish_id, []).append(row)
+
+        self.dish_ids = array("q", (row.id for row in dishes))
+        self.dish_rows = tuple((row.id, row.name, row.country) for row in dishes)
+        self.dish_names = tuple(row.name.translate(_ASCII_LOWER) for row in dishes)
+        dish_json = []
+        summary_json = []
+        by_dish_json = []
+        for row in dishes:
+            entries = allergens_by_dish.get(row.id, ())
+            nested = [
+                {"allergen": entry.allergen, "likelihood": entry.likelihood}
+                for entry in entries
+            ]
+            summary = _dumps(nested)
+            dish_json.append(
+                _dumps({"name": row.name, "country": row.country, "id": row.id})[:-1]
+                + b',"allergens":'
+                + summary
+                + b"}"
+            )
+            summary_json.append(summary)
+            by_dish_json.append(_join(self._allergen_json(entry) for entry in entries))
+        self.dish_json = tuple(dish_json)
+        self.summary_json = tuple(summary_json)
+        self.by_dish_json = tuple(by_dish_json)
+        self.all_dishes_json = CompressedBody(_join(self.dish_json))
+
+        self.allergen_ids = array("q", (row.id for row in likelihoods))
+        self.allergen_json = tuple(self._allergen_json(row) for row in likelihoods)
+        self.all_allergens_json = CompressedBody(_join(self.allergen_json))
+
+    @staticmethod
+    def _allergen_json(row) -> bytes:
+        return _dumps(
+            {
+                "dish_id": row.dish_id,
+                "allergen": row.allergen,
+                "likelihood": row.likelihood,
+                "id": row.id,
+            }
+        )
+
+    @classmethod
+    def load(cls, db: Session) -> "Snapshot":
+        dishes = db.execute(
+            select(Dish.id, Dish.name, Dish.country).order_by(Dish.id)
+        ).all()
+        likelihoods = db.execute(
+            select(
+                AllergenLikelihood.id,
+                AllergenLikelihood.dish_id,
+                AllergenLikelihood.allergen,
+                AllergenLikelihood.likelihood,
+            ).order_by(AllergenLikelihood.id)
+        ).all()
+        return cls(dishes, likelihoods)
+
+    def project(
+        self, offset: int, columns: tuple[str, ...], include_allergens: bool
+    ) -> bytes:
+        """Serialize only the requested fields of the dish at an offset."""
+        row = self.dish_rows[offset]
+        body = _dumps({c: row[_DISH_COLUMNS[c]] for c in columns})
+        if include_allergens:
+            body = (
+                body[:-1]
+                + (b',"allergens":' if columns else b'"allergens":')
+                + self.summary_json[offset]
+                + b"}"
+            )
+        return body
+
+    def get_all_dishes(
+        self, columns: tuple[str, ...], include_allergens: bool
+    ) -> bytes:
+        return _join(
+            self.project(offset, columns, include_allergens)
+            for offset in range(len(self.dish_rows))
+        )
+
+    def get_dish(
+        self,
+        dish_id: int,
+        columns: Optional[tuple[str, ...]] = None,
+        include_allergens: bool = True,
+    ) -> Optional[bytes]:
+        offset = _find(self.dish_ids, dish_id)
+        if offset is None:
+            return None
+        if columns is None:
+            return self.dish_json[offset]
+        return self.project(offset, columns, include_allergens)
+
+    def get_dish_summary(self, dish_id: int) -> Optional[bytes]:
+        offset = _find(self.dish_ids, dish_id)
+        return None if offset is None else self.summary_json[offset]
+
+    def search_dish(
+        self,
+        query: str,
+        columns: Optional[tuple[str, ...]] = None,
+        include_allergens: bool = True,
+    ) -> bytes:
+        matches = _like_matcher(query)
+        offsets = [i for i, name in enumerate(self.dish_names) if matches(name)]
+        if columns is None:
+            return _join(self.dish_json[i] for i in offsets)
+        return _join(self.project(i, columns, include_allergens) for i in offsets)
+
+    def get_allergen_likelihood(self, allergen_id: int) -> Optional[bytes]:
+        offset = _find(self.allergen_ids, allergen_id)
+        return None if offset is None else self.allergen_json[offset]
+
+    def get_allergen_likelihoods_by_dish(self, dish_id: int) -> bytes:
+        offset = _find(self.dish_ids, dish_id)
+        return b"[]" if offset is None else self.by_dish_json[offset]
+
+
+_snapshot: Optional[Snapshot] = None
+_reload_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[Snapshot]:
+    return _snapshot
+
+
+def reload_snapshot() -> Snapshot:
+    """Build a fresh snapshot from the database and swap it in atomically."""
+    global _snapshot
+    with _reload_lock:
+        with SessionLocal() as db:
+            snapshot = Snapshot.load(db)
+        _snapshot = snapshot
+    return snapshot
+
+
+def install_reload_handler() -> None:
+    """Reload the snapshot in the background whenever the process gets SIGHUP."""
+    if not hasattr(signal, "SIGHUP"):
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(
+        signal.SIGHUP,
+        lambda signum, frame: threading.Thread(
+            target=reload_snapshot, name="snapshot-reload", daemon=True
+        ).start(),
+    )
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
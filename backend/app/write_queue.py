@@ -0,0 +1,163 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import SessionLocal
+
+BATCH_WRITES = os.getenv("BATCH_WRITES", "0") == "1"
+
+
+class WriteQueue:
+    """Group-commit writer for CRUD write functions.
+
+    Submitted operations are queued and drained by a single writer thread,
+    which runs every operation of a batch in one session with ``commit=False``
+    and commits once. If the batch fails as a whole, its operations are
+    replayed one transaction at a time so each caller still gets its own
+    result or error.
+
+    Only the commit, and with it the fsync, is shared. Each operation still
+    flushes on its own: its duplicate check must see the rows written earlier
+    in the batch, and its change log entry needs the new row's id. Where
+    fsync is cheap, that per-operation ORM work sets the throughput.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        max_batch: int = 256,
+        max_wait: float = 0.002,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.commits = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Queue ``fn(db, *args)`` and block until its batch is committed."""
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._queue,),
+                    name="write-queue",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._queue.put((fn, args, future))
+        return future.result()
+
+    def close(self) -> None:
+        """Drain pending operations and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            work, self._queue = self._queue, queue.Queue()
+        if thread is not None:
+            work.put(None)
+            thread.join()
+
+    def _run(self, work: queue.Queue) -> None:
+        batch: list[tuple] = []
+        try:
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                batch = [item]
+                stop = False
+                deadline = time.monotonic() + self._max_wait
+                while len(batch) < self._max_batch:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = (
+                            work.get(timeout=timeout)
+                            if timeout > 0
+                            else work.get_nowait()
+                        )
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                self._flush(batch)
+                batch = []
+                if stop:
+                    return
+        except BaseException as exc:
+            # Never leave submitters blocked on a writer that is gone: detach
+            # this thread's queue so new submits start a fresh writer, then
+            # fail everything still waiting on it.
+            with self._lock:
+                if self._queue is work:
+                    self._thread = None
+                    self._queue = queue.Queue()
+            self._fail_pending(work, batch, exc)
+            raise
+
+    def _fail_pending(
+        self, work: queue.Queue, batch: list[tuple], exc: BaseException
+    ) -> None:
+        pending = list(batch)
+        while True:
+            try:
+                item = work.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                pending.append(item)
+        error = RuntimeError(f"Write queue stopped: {exc!r}")
+        error.__cause__ = exc
+        for _, _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _flush(self, batch: list[tuple]) -> None:
+        db: Session = self._session_factory(expire_on_commit=False)
+        try:
+            try:
+                results = [fn(db, *args, commit=False) for fn, args, _ in batch]
+                db.commit()
+            except Exception:
+                # Nothing was committed, so each operation can run on its own.
+                db.rollback()
+                committed = False
+            else:
+                committed = True
+        finally:
+            db.close()
+
+        if not committed:
+            self._replay(batch)
+            return
+        self.commits += 1
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _replay(self, batch: list[tuple]) -> None:
+        for fn, args, future in batch:
+            db: Session = self._session_factory(expire_on_commit=False)
+            try:
+                future.set_result(fn(db, *args))
+            except Exception as exc:
+                db.rollback()
+                future.set_exception(exc)
+            finally:
+                db.close()
+            self.commits += 1
+
+
+write_queue: Optional[WriteQueue] = WriteQueue(SessionLocal) if BATCH_WRITES else None
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    return write_queue
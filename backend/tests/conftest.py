@@ -4,6 +4,9 @@ from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.database import Base, get_db
+from app.write_queue import WriteQueue, get_write_queue
+from app.cache import response_cache
+from app.similarity import similarity_index
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -33,9 +36,18 @@ def override_get_db():
 app.dependency_overrides[get_db] = override_get_db
 
 
+def write_outside_app(*statements: str) -> None:
+    """Run raw SQL the way another process would, bypassing this process's sessions."""
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+
 @pytest.fixture(scope="function")
 def client():
     Base.metadata.create_all(bind=engine)
+    response_cache.clear()
+    similarity_index.reset()
     with TestClient(app) as c:
         yield c
     Base.metadata.drop_all(bind=engine)
@@ -47,3 +59,31 @@ def test_dish(client):
     response = client.post("/dishes", json=dish_data)
     assert response.status_code == 201
     return response.json()
+
+
+@pytest.fixture
+def dish_factory(client):
+    """Create a dish with the given allergen likelihoods and return its id."""
+
+    def create(name, country="Testland", allergens=None):
+        response = client.post("/dishes", json={"name": name, "country": country})
+        assert response.status_code == 201
+        dish_id = response.json()["id"]
+        for allergen, likelihood in (allergens or {}).items():
+            response = client.post(
+                "/allergens",
+                json={"dish_id": dish_id, "allergen": allergen, "likelihood": likelihood},
+            )
+            assert response.status_code == 201
+        return dish_id
+
+    return create
+
+
+@pytest.fixture
+def batched_writes(client):
+    queue = WriteQueue(TestingSessionLocal, max_wait=0.05)
+    app.dependency_overrides[get_write_queue] = lambda: queue
+    yield queue
+    del app.dependency_overrides[get_write_queue]
+    queue.close()
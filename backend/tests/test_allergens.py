@@ -122,3 +122,19 @@ def test_delete_allergen(client, test_dish):
 
     response2 = client.delete(f"/allergens/{data['id']}")
     assert response2.status_code == 204
+
+
+def test_delete_allergens_by_dish(client, test_dish):
+    for name in ["Nuts", "Gluten"]:
+        allergen = {"dish_id": test_dish["id"], "allergen": name, "likelihood": 50}
+        response = client.post("/allergens", json=allergen)
+        assert response.status_code == 201
+
+    response = client.delete(f"/allergens/by-dish/{test_dish['id']}")
+    assert response.status_code == 204
+
+    response = client.get(f"/allergens/by-dish/{test_dish['id']}")
+    assert response.json() == []
+
+    feed = client.get("/changes").json()
+    assert [c["op"] for c in feed["changes"]].count("delete") == 2
@@ -0,0 +1,94 @@
+import pytest
+
+
+def test_batch_with_references(client, test_dish):
+    existing = client.post(
+        "/allergens",
+        json={"dish_id": test_dish["id"], "allergen": "Milk", "likelihood": 20},
+    ).json()
+
+    operations = [
+        {"op": "create_dish", "data": {"name": "Pad Thai", "country": "Thailand"}},
+        {
+            "op": "create_allergen_likelihood",
+            "data": {"dish_id": "$0", "allergen": "Nuts", "likelihood": 90},
+        },
+        {
+            "op": "create_allergen_likelihood",
+            "data": {"dish_id": "$0", "allergen": "Shellfish", "likelihood": 40},
+        },
+        {"op": "delete_allergen_likelihood", "data": {"id": existing["id"]}},
+    ]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["status"] for r in results] == [201, 201, 201, 204]
+    dish_id = results[0]["data"]["id"]
+    assert results[1]["data"]["dish_id"] == dish_id
+
+    response = client.get(f"/dishes/{dish_id}")
+    assert {a["allergen"] for a in response.json()["allergens"]} == {"Nuts", "Shellfish"}
+    assert client.get(f"/allergens/id/{existing['id']}").status_code == 404
+
+
+def test_batch_is_atomic(client, test_dish):
+    operations = [
+        {"op": "create_dish", "data": {"name": "Pad Thai", "country": "Thailand"}},
+        {"op": "create_dish", "data": {"name": test_dish["name"], "country": "X"}},
+    ]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 400
+    assert response.json()["detail"] == {
+        "index": 1,
+        "op": "create_dish",
+        "detail": "Dish already exists",
+    }
+
+    names = [dish["name"] for dish in client.get("/dishes").json()]
+    assert names == [test_dish["name"]]
+
+
+def test_batch_rejects_bad_references(client):
+    operations = [
+        {
+            "op": "create_allergen_likelihood",
+            "data": {"dish_id": "$0", "allergen": "Nuts", "likelihood": 90},
+        },
+    ]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 422
+    assert response.json()["detail"]["index"] == 0
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "delete_allergen_likelihood", "data": {"id": "$0"}},
+        {
+            "op": "create_allergen_likelihood",
+            "data": {"dish_id": "$1", "allergen": "Gluten", "likelihood": 10},
+        },
+        {"op": "delete_dish", "data": {"id": "$1"}},
+    ],
+)
+def test_batch_rejects_references_to_the_wrong_kind_of_row(client, operation):
+    operations = [
+        {"op": "create_dish", "data": {"name": "Pad Thai", "country": "Thailand"}},
+        {
+            "op": "create_allergen_likelihood",
+            "data": {"dish_id": "$0", "allergen": "Nuts", "likelihood": 90},
+        },
+        operation,
+    ]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 422
+    assert response.json()["detail"]["index"] == 2
+    assert client.get("/dishes").json() == []
+
+
+@pytest.mark.parametrize("op", ["delete_dish", "delete_allergen_likelihood"])
+def test_batch_rejects_boolean_ids(client, test_dish, op):
+    operations = [{"op": op, "data": {"id": True}}]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 422
+    assert response.json()["detail"]["detail"] == "An integer id is required"
+    assert client.get(f"/dishes/{test_dish['id']}").status_code == 200
@@ -0,0 +1,45 @@
+def test_change_feed_records_inserts_and_tombstones(client, test_dish):
+    allergen = {"dish_id": test_dish["id"], "allergen": "Nuts", "likelihood": 60}
+    allergen_id = client.post("/allergens", json=allergen).json()["id"]
+
+    response = client.get("/changes?since=0")
+    assert response.status_code == 200
+    feed = response.json()
+    assert [(c["entity"], c["op"]) for c in feed["changes"]] == [
+        ("dish", "insert"),
+        ("allergen_likelihood", "insert"),
+    ]
+    assert feed["changes"][0]["data"]["name"] == test_dish["name"]
+    assert feed["changes"][1]["data"] == {**allergen, "id": allergen_id}
+    assert feed["has_more"] is False
+
+    client.delete(f"/dishes/{test_dish['id']}")
+
+    response = client.get(f"/changes?since={feed['cursor']}")
+    feed2 = response.json()
+    assert [
+        (c["entity"], c["entity_id"], c["op"], c["data"]) for c in feed2["changes"]
+    ] == [
+        ("allergen_likelihood", allergen_id, "delete", None),
+        ("dish", test_dish["id"], "delete", None),
+    ]
+
+    response = client.get(f"/changes?since={feed2['cursor']}")
+    assert response.json() == {
+        "changes": [],
+        "cursor": feed2["cursor"],
+        "has_more": False,
+    }
+
+
+def test_change_feed_pagination(client):
+    for i in range(3):
+        client.post("/dishes", json={"name": f"Dish {i}", "country": "Testland"})
+
+    feed = client.get("/changes?since=0&limit=2").json()
+    assert len(feed["changes"]) == 2
+    assert feed["has_more"] is True
+
+    feed = client.get(f"/changes?since={feed['cursor']}&limit=2").json()
+    assert [c["data"]["name"] for c in feed["changes"]] == ["Dish 2"]
+    assert feed["has_more"] is False
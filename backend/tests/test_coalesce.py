@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.coalesce import SingleFlight, dish_reads
+from app.routers import dish as dish_router
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"id": 1}
+
+    def worker():
+        results.append(flight.do(("dish", 1), fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert flight.coalesced == 4
+    assert all(result is results[0] for result in results)
+
+
+def test_errors_are_shared_and_key_is_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+
+    assert flight.do("key", lambda: "ok") == "ok"
+    assert flight.coalesced == 0
+
+
+@pytest.mark.parametrize(
+    "path, name, adapter",
+    [
+        ("/dishes/{id}", "get_dish", "_dish"),
+        ("/dishes/summary?dish_id={id}", "get_dish_summary", "_summary_list"),
+    ],
+)
+def test_concurrent_dish_reads_are_coalesced(
+    client, test_dish, monkeypatch, path, name, adapter
+):
+    release = threading.Event()
+    calls = []
+    original = getattr(dish_router, name)
+    serializer = getattr(dish_router, adapter)
+    serialized = []
+
+    def blocking(db, dish_id):
+        calls.append(dish_id)
+        release.wait(timeout=5)
+        return original(db, dish_id)
+
+    class CountingAdapter:
+        def dump_json(self, value):
+            serialized.append(value)
+            return serializer.dump_json(value)
+
+    monkeypatch.setattr(dish_router, name, blocking)
+    monkeypatch.setattr(dish_router, adapter, CountingAdapter())
+    before = client.get("/stats/coalescing").json()["coalesced"]
+
+    url = path.format(id=test_dish["id"])
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(client.get, url) for _ in range(5)]
+        deadline = time.monotonic() + 5
+        while dish_reads.coalesced < before + 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        responses = [future.result() for future in futures]
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len(calls) == 1
+    assert len(serialized) == 1
+    assert all(response.content == responses[0].content for response in responses)
+    assert client.get("/stats/coalescing").json()["coalesced"] == before + 4
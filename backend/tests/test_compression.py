@@ -0,0 +1,82 @@
+import gzip
+
+import anyio
+from starlette.datastructures import Headers
+
+from app.compression import CompressedBody, CompressionMiddleware, choose_encoding
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") in ("br", "gzip")
+
+
+def test_large_list_is_compressed(client, dish_factory):
+    for i in range(40):
+        dish_factory(f"Dish {i}")
+
+    response = client.get("/dishes", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 40
+
+    response = client.get("/dishes", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 40
+
+
+def test_small_response_is_not_compressed(client, test_dish):
+    response = client.get(f"/dishes/{test_dish['id']}", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/dishes/search?query=x", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_middleware_compresses_uncached_responses(client, dish_factory):
+    for i in range(40):
+        dish_factory(f"Dish {i}")
+
+    response = client.get("/dishes/search?query=Dish", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 40
+
+
+def test_compressed_body_is_reused():
+    body = CompressedBody(b'{"name":"Dish"}' * 100)
+    first = body.encoded("gzip")
+    assert body.encoded("gzip") is first
+    assert gzip.decompress(first) == body.raw
+    assert body.encoded(None) is body.raw
+
+
+def test_streaming_response_is_not_buffered():
+    chunk = b"data: " + b"x" * 2048 + b"\n\n"
+    sent = []
+
+    async def events(scope, receive, send):
+        headers = [(b"content-type", b"text/event-stream")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        assert [message["type"] for message in sent] == [
+            "http.response.start",
+            "http.response.body",
+        ]
+        await send({"type": "http.response.body", "body": chunk})
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    anyio.run(CompressionMiddleware(events), scope, receive, send)
+
+    headers = Headers(raw=sent[0]["headers"])
+    assert "content-encoding" not in headers
+    assert "Accept-Encoding" in headers["vary"]
+    assert [message["body"] for message in sent[1:]] == [chunk, chunk]
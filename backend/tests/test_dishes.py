@@ -1,3 +1,8 @@
+import pytest
+
+from conftest import engine, write_outside_app
+
+
 def test_create_dish(client):
     dish = {"name": "Test dish", "country": "Testland"}
 
@@ -112,3 +117,96 @@ def test_delete_dish(client):
 
     response2 = client.delete(f"/dishes/{data['id']}")
     assert response2.status_code == 204
+
+
+def test_delete_dish_cascades_to_allergens(client, test_dish):
+    allergen = {"dish_id": test_dish["id"], "allergen": "Nuts", "likelihood": 60}
+    response = client.post("/allergens", json=allergen)
+    allergen_id = response.json()["id"]
+
+    response = client.delete(f"/dishes/{test_dish['id']}")
+    assert response.status_code == 204
+
+    response = client.get(f"/allergens/id/{allergen_id}")
+    assert response.status_code == 404
+
+
+def test_bulk_delete_dishes(client):
+    ids = []
+    for name in ["Dish one", "Dish two", "Dish three"]:
+        response = client.post("/dishes", json={"name": name, "country": "Testland"})
+        ids.append(response.json()["id"])
+    client.post("/allergens", json={"dish_id": ids[0], "allergen": "Nuts", "likelihood": 60})
+
+    response = client.delete(f"/dishes?ids={ids[0]}&ids={ids[1]}")
+    assert response.status_code == 204
+
+    response = client.get("/dishes")
+    assert [dish["id"] for dish in response.json()] == [ids[2]]
+    assert client.get("/allergens").json() == []
+
+
+@pytest.mark.parametrize("path", ["/dishes/{id}", "/dishes?ids={id}"])
+def test_delete_dish_without_cascading_foreign_key(client, test_dish, path):
+    # Databases created before the cascade migration have a plain foreign key.
+    with engine.begin() as conn:
+        table = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE name = 'allergen_likelihoods'"
+        ).scalar_one()
+        conn.exec_driver_sql("DROP TABLE allergen_likelihoods")
+        conn.exec_driver_sql(table.replace(" ON DELETE CASCADE", ""))
+    allergen = {"dish_id": test_dish["id"], "allergen": "Nuts", "likelihood": 60}
+    client.post("/allergens", json=allergen)
+
+    response = client.delete(path.format(id=test_dish["id"]))
+    assert response.status_code == 204
+    assert client.get("/allergens").json() == []
+
+
+def test_sparse_fieldsets(client, test_dish):
+    allergen = {"dish_id": test_dish["id"], "allergen": "Nuts", "likelihood": 60}
+    client.post("/allergens", json=allergen)
+
+    response = client.get("/dishes?fields=id,name")
+    assert response.status_code == 200
+    assert response.json() == [{"id": test_dish["id"], "name": test_dish["name"]}]
+
+    response = client.get("/dishes/search?query=Test&fields=name&include=allergens")
+    assert response.json() == [
+        {"name": test_dish["name"], "allergens": [{"allergen": "Nuts", "likelihood": 60}]}
+    ]
+
+    response = client.get(f"/dishes/{test_dish['id']}?fields=country")
+    assert response.json() == {"country": test_dish["country"]}
+
+    response = client.get("/dishes/999?fields=id")
+    assert response.status_code == 404
+
+    response = client.get("/dishes?fields=id,secret")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: secret"
+
+    for fields in ("", ",,"):
+        response = client.get(f"/dishes?fields={fields}")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "No fields requested"
+
+
+def test_sparse_fieldsets_are_documented(client):
+    schema = client.get("/openapi.json").json()
+    response = schema["paths"]["/dishes/{dish_id}"]["get"]["responses"]["200"]
+    refs = response["content"]["application/json"]["schema"]["anyOf"]
+    assert {"$ref": "#/components/schemas/DishPartial"} in refs
+
+
+def test_dish_list_sees_writes_from_other_processes(client, test_dish):
+    assert len(client.get("/dishes").json()) == 1
+
+    write_outside_app(
+        "INSERT INTO dishes (name, country) VALUES ('Imported', 'Testland')",
+        "INSERT INTO changes (entity, entity_id, op) "
+        "SELECT 'dish', max(id), 'insert' FROM dishes",
+    )
+
+    names = [dish["name"] for dish in client.get("/dishes").json()]
+    assert names == [test_dish["name"], "Imported"]
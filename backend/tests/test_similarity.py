@@ -0,0 +1,53 @@
+from conftest import write_outside_app
+
+
+def test_similar_dishes_ranked_by_profile(client, dish_factory):
+    pad_thai = dish_factory("Pad Thai", allergens={"Nuts": 90, "Shellfish": 40})
+    dish_factory("Satay", allergens={"Nuts": 80, "Shellfish": 30})
+    dish_factory("Pizza", allergens={"Gluten": 100})
+    dish_factory("Salad", allergens={})
+
+    response = client.get(f"/dishes/{pad_thai}/similar?k=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["name"] for d in data][0] == "Satay"
+    assert len(data) == 2
+    assert data[0]["score"] > 0.99
+
+    response = client.get(f"/dishes/{pad_thai}/similar?metric=l1&exclude=Gluten")
+    names = [d["name"] for d in response.json()]
+    assert names == ["Satay", "Salad"]
+
+
+def test_similar_dishes_follow_writes(client, dish_factory):
+    pad_thai = dish_factory("Pad Thai", allergens={"Nuts": 90})
+    pizza = dish_factory("Pizza", allergens={"Gluten": 100})
+    assert client.get(f"/dishes/{pad_thai}/similar").json()[0]["name"] == "Pizza"
+
+    satay = dish_factory("Satay", allergens={"Nuts": 70})
+    data = client.get(f"/dishes/{pad_thai}/similar").json()
+    assert [d["id"] for d in data] == [satay, pizza]
+
+    client.delete(f"/dishes/{satay}")
+    data = client.get(f"/dishes/{pad_thai}/similar").json()
+    assert [d["id"] for d in data] == [pizza]
+
+    assert client.get(f"/dishes/{satay}/similar").status_code == 404
+
+
+def test_similar_dishes_see_writes_from_other_processes(client, dish_factory):
+    pad_thai = dish_factory("Pad Thai", allergens={"Nuts": 90})
+    pizza = dish_factory("Pizza", allergens={"Gluten": 100})
+    satay = dish_factory("Satay", allergens={"Shellfish": 70})
+    data = client.get(f"/dishes/{pad_thai}/similar").json()
+    assert data[0]["score"] == 0
+
+    write_outside_app(
+        "INSERT INTO allergen_likelihoods (dish_id, allergen, likelihood) "
+        f"VALUES ({satay}, 'Nuts', 80)",
+        "INSERT INTO changes (entity, entity_id, op) "
+        "SELECT 'allergen_likelihood', max(id), 'insert' FROM allergen_likelihoods",
+    )
+
+    data = client.get(f"/dishes/{pad_thai}/similar").json()
+    assert [d["id"] for d in data] == [satay, pizza]
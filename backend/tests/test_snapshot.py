@@ -0,0 +1,49 @@
+from app.main import app
+from app.snapshot import Snapshot, get_snapshot
+from conftest import TestingSessionLocal
+
+
+def test_snapshot_matches_database_responses(client):
+    dish1 = client.post("/dishes", json={"name": "Pad Thai", "country": "Thailand"})
+    dish2 = client.post("/dishes", json={"name": "Pizza", "country": "Italy"})
+    client.post("/dishes", json={"name": "Crème Brûlée", "country": "France"})
+    dish_id = dish1.json()["id"]
+    allergen = {"dish_id": dish_id, "allergen": "Nuts", "likelihood": 90}
+    allergen_id = client.post("/allergens", json=allergen).json()["id"]
+    client.post("/allergens", json={**allergen, "allergen": "Shellfish"})
+    client.post(
+        "/allergens",
+        json={"dish_id": dish2.json()["id"], "allergen": "Gluten", "likelihood": 100},
+    )
+
+    paths = [
+        "/dishes",
+        "/dishes?fields=id,name",
+        "/dishes/search?query=PAD",
+        "/dishes/search?query=PAD&fields=name&include=allergens",
+        "/dishes/search?query=p_d",
+        "/dishes/search?query=z%25a",
+        "/dishes/search?query=crème",
+        "/dishes/search?query=CRÈME",
+        f"/dishes/summary?dish_id={dish_id}",
+        f"/dishes/{dish_id}",
+        f"/dishes/{dish_id}?fields=allergens",
+        "/dishes/999",
+        "/allergens",
+        f"/allergens/by-dish/{dish_id}",
+        f"/allergens/id/{allergen_id}",
+        "/allergens/id/999",
+    ]
+    expected = [client.get(path) for path in paths]
+
+    with TestingSessionLocal() as db:
+        snapshot = Snapshot.load(db)
+    app.dependency_overrides[get_snapshot] = lambda: snapshot
+    try:
+        client.post("/dishes", json={"name": "Added later", "country": "Testland"})
+        for path, response in zip(paths, expected):
+            served = client.get(path)
+            assert served.status_code == response.status_code, path
+            assert served.json() == response.json(), path
+    finally:
+        del app.dependency_overrides[get_snapshot]
@@ -0,0 +1,55 @@
+from conftest import write_outside_app
+
+
+def test_stats_by_country(client, dish_factory):
+    dish_factory("Pad Thai", "Thailand", {"Nuts": 90, "Shellfish": 40})
+    dish_factory("Green Curry", "Thailand", {"Nuts": 30})
+    dish_factory("Pizza", "Italy", {"Gluten": 100})
+    dish_factory("Risotto", "Italy", {})
+
+    response = client.get("/stats/allergens?group_by=country")
+    assert response.status_code == 200
+    data = response.json()
+
+    nuts = next(s for s in data if s["country"] == "Thailand" and s["allergen"] == "Nuts")
+    assert nuts["dish_count"] == 2
+    assert nuts["prevalence"] == 1.0
+    assert nuts["mean_likelihood"] == 60
+    assert nuts["max_likelihood"] == 90
+
+    gluten = next(s for s in data if s["country"] == "Italy")
+    assert gluten["allergen"] == "Gluten"
+    assert gluten["prevalence"] == 0.5
+
+
+def test_stats_by_allergen_invalidated_on_write(client, dish_factory):
+    dish_id = dish_factory("Pad Thai", "Thailand", {"Nuts": 90})
+    dish_factory("Pizza", "Italy", {"Gluten": 100})
+
+    response = client.get("/stats/allergens?group_by=allergen")
+    assert response.status_code == 200
+    nuts = next(s for s in response.json() if s["allergen"] == "Nuts")
+    assert nuts["country"] is None
+    assert nuts["dish_count"] == 1
+    assert nuts["prevalence"] == 0.5
+
+    client.delete(f"/dishes/{dish_id}")
+
+    response = client.get("/stats/allergens?group_by=allergen")
+    assert [s["allergen"] for s in response.json()] == ["Gluten"]
+    assert response.json()[0]["prevalence"] == 1.0
+
+
+def test_stats_see_writes_from_other_processes(client, dish_factory):
+    dish_id = dish_factory("Pad Thai", "Thailand", {"Nuts": 90})
+    assert len(client.get("/stats/allergens?group_by=allergen").json()) == 1
+
+    write_outside_app(
+        "INSERT INTO allergen_likelihoods (dish_id, allergen, likelihood) "
+        f"VALUES ({dish_id}, 'Shellfish', 40)",
+        "INSERT INTO changes (entity, entity_id, op) "
+        "SELECT 'allergen_likelihood', max(id), 'insert' FROM allergen_likelihoods",
+    )
+
+    response = client.get("/stats/allergens?group_by=allergen")
+    assert sorted(s["allergen"] for s in response.json()) == ["Nuts", "Shellfish"]
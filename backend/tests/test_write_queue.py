@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.cache import _commit_listeners
+from app.crud.allergen import create_allergen_likelihood
+from app.schemas.allergen import AllergenLikelihoodCreate
+from app.write_queue import WriteQueue
+from conftest import TestingSessionLocal
+
+
+def test_batched_creates_and_deletes(client, test_dish, batched_writes):
+    def create(i):
+        allergen = {
+            "dish_id": test_dish["id"],
+            "allergen": f"Allergen {i}",
+            "likelihood": i,
+        }
+        return client.post("/allergens", json=allergen)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(create, range(40)))
+
+    assert all(response.status_code == 201 for response in responses)
+    ids = {response.json()["id"] for response in responses}
+    assert len(ids) == 40
+    assert batched_writes.commits < 40
+
+    response = client.delete(f"/allergens/{responses[0].json()['id']}")
+    assert response.status_code == 204
+    response = client.delete(f"/allergens/{responses[0].json()['id']}")
+    assert response.status_code == 404
+
+    response = client.get(f"/allergens/by-dish/{test_dish['id']}")
+    assert len(response.json()) == 39
+
+
+def test_batched_errors_are_per_caller(client, test_dish, batched_writes):
+    allergen = {"dish_id": test_dish["id"], "allergen": "Nuts", "likelihood": 50}
+
+    response = client.post("/allergens", json=allergen)
+    assert response.status_code == 201
+
+    response = client.post("/allergens", json=allergen)
+    assert response.status_code == 400
+
+    response = client.post("/allergens", json={**allergen, "dish_id": 999})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Dish does not exist"
+
+
+def test_queued_writes_share_one_commit(client, test_dish):
+    queue = WriteQueue(TestingSessionLocal, max_wait=1.0)
+
+    def create(i):
+        allergen = AllergenLikelihoodCreate(
+            dish_id=test_dish["id"], allergen=f"Allergen {i}", likelihood=i
+        )
+        return queue.submit(create_allergen_likelihood, allergen)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(create, range(5)))
+    queue.close()
+
+    assert len({result.id for result in results}) == 5
+    assert queue.commits == 1
+
+
+def test_failing_commit_listener_does_not_replay(client, test_dish, batched_writes):
+    def broken_listener(changes, change_ids):
+        raise RuntimeError("listener failed")
+
+    _commit_listeners.append(broken_listener)
+    try:
+        allergen = {"dish_id": test_dish["id"], "allergen": "Nuts", "likelihood": 50}
+        response = client.post("/allergens", json=allergen)
+    finally:
+        _commit_listeners.remove(broken_listener)
+
+    assert response.status_code == 201
+    assert batched_writes.commits == 1
+    response = client.get(f"/allergens/by-dish/{test_dish['id']}")
+    assert len(response.json()) == 1
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_writer_exit_fails_pending_submits(client):
+    class Stop(BaseException):
+        pass
+
+    def stop(db, commit=True):
+        raise Stop()
+
+    queue = WriteQueue(TestingSessionLocal)
+    with pytest.raises(RuntimeError, match="Write queue stopped"):
+        queue.submit(stop)
+
+    assert queue.submit(lambda db, commit=True: "ok") == "ok"
+    queue.close()